@@ -1,30 +1,126 @@
 """
 GGOutlier check
 - passes a simple set of inputs to the main function of ggoutlier
-- runs ggoutlier
+- runs ggoutlier in a child process
 - extracts QAX summary information from GGOutlier output files
 - moves outputs to QAX 'detailed spatial outputs' folder
 """
 
-import geojson.geometry
-from osgeo import ogr, osr
+from __future__ import annotations
+
+from concurrent.futures import CancelledError, ProcessPoolExecutor, \
+    as_completed
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
-from typing import Optional
-import distutils
-import geojson
-import ggoutlier
-import glob
-import json
+from typing import TYPE_CHECKING, Callable, Optional
+import functools
 import logging
+import multiprocessing
+import orjson
 import os
-import rasterio
+import re
 import shutil
+import struct
+import subprocess
+import sys
 import tempfile
 
-from ausseabed.qajson.model import QajsonParam, QajsonOutputs, QajsonExecution
+from ausseabed.qajson.model import QajsonParam
+
+# osgeo and rasterio are imported where they're used, importing them loads
+# GDAL which slows down the QAX plugin discovery that imports this module
+if TYPE_CHECKING:
+    from osgeo import ogr, osr
 
+__all__ = ['GgoutlierCheck', 'run_checks']
 
 LOG = logging.getLogger(__name__)
+# output of the GGOutlier child process is relayed through this logger
+GGOUTLIER_LOG = logging.getLogger('ggoutlier')
+
+
+# GgoutlierCheck attributes populated by running a check
+_RESULT_ATTRIBUTES = (
+    'points_total',
+    'points_outside_spec',
+    'points_outside_spec_percentage',
+    'max_geojson_points_exceeded',
+    'geojson_point_features',
+    'geojson_seq_file',
+    'extents_geojson',
+    'messages',
+    'passed',
+    'start_time',
+    'end_time',
+)
+
+# code run by the child python process to call GGOutlier's main function with
+# the command line args that follow
+_GGOUTLIER_MAIN = 'import sys, ggoutlier; ggoutlier.main(sys.argv[1:])'
+
+# summary metrics GGOutlier writes to its log, and the GgoutlierCheck
+# attribute each is stored in
+_LOG_METRICS = {
+    b'Points checked': ('points_total', int),
+    b'Points outside specification': ('points_outside_spec', int),
+    b'Percentage outside specification': ('points_outside_spec_percentage', float),
+}
+_LOG_RE = re.compile(
+    rb':(?P<metric>' + b'|'.join(re.escape(m) for m in _LOG_METRICS) + rb'):'
+    # the rest of the line is the value, [ \t] rather than \s so a missing
+    # value doesn't pick up the next line
+    rb'[ \t]*(?P<value>[^\r\n]*)'
+)
+# thousands separators are removed from values before conversion
+_DROP_COMMAS = b','
+
+
+@functools.lru_cache(maxsize=32)
+def _get_transform_to_wgs84(src_wkt: str) -> osr.CoordinateTransformation:
+    """ Gets a transform from the given CRS to WGS84 (4326) with coordinates
+    in lon/lat order, as needed for geojson. Transforms are cached as they're
+    relatively expensive to create. Note: a transform is not safe to share
+    between threads, but checks are only run in a single thread.
+    """
+    from osgeo import osr
+
+    src_proj = osr.SpatialReference()
+    src_proj.ImportFromWkt(src_wkt)
+    dst_proj = osr.SpatialReference()
+    dst_proj.ImportFromEPSG(4326)
+    dst_proj.SetAxisMappingStrategy(osr.OAMS_TRADITIONAL_GIS_ORDER)
+    return osr.CoordinateTransformation(src_proj, dst_proj)
+
+
+def _wkb_point_xy(wkb: bytes | None) -> tuple[float, float] | None:
+    """ Returns the x and y of a WKB encoded point, or None if the geometry
+    is not a point. Any Z or M values are ignored.
+    """
+    if wkb is None or len(wkb) < 21:
+        return None
+    byte_order = '<' if wkb[0] == 1 else '>'
+    geometry_type, x, y = struct.unpack_from(byte_order + 'Idd', wkb, 1)
+    # ISO WKB encodes Z/M as +1000/+2000/+3000, the older extended WKB uses
+    # the high bits
+    if (geometry_type & 0x0FFFFFFF) % 1000 != 1:
+        return None
+    return x, y
+
+
+def _column_values(column) -> list:
+    """ Converts a column of an Arrow stream batch to a list of python
+    values, matching the types GetField returns when features are read one at
+    a time. GDAL returns string (and, with DATETIME_AS_STRING, date/time)
+    columns as object arrays of bytes, these are decoded to str.
+    """
+    values = column.tolist()
+    if column.dtype.kind == 'O':
+        values = [
+            v.decode('utf-8', errors='replace') if isinstance(v, bytes) else v
+            for v in values
+        ]
+    return values
 
 
 class GgoutlierCheck:
@@ -44,6 +140,18 @@ class GgoutlierCheck:
         QajsonParam("Verbose", False),
     ]
     parameter_help_link = 'user_manual_qax_ggoutlier.html#input-parameters'
+    # all outlier points are written to this file in the detailed spatial
+    # outputs, as a GeoJSON text sequence
+    geojson_seq_filename = 'outliers.geojsonseq'
+    # number of decimal places the lon/lat of outlier points are rounded to,
+    # 7 is roughly 1cm. Keeps the size of the qajson map data down.
+    geojson_coordinate_precision = 7
+    # python interpreter used to run GGOutlier. In a frozen app sys.executable
+    # is the app itself, so this must be set to a python interpreter that has
+    # ggoutlier installed.
+    python_executable: Optional[str] = (
+        None if getattr(sys, 'frozen', False) else sys.executable
+    )
 
     def __init__(
         self,
@@ -51,9 +159,14 @@ class GgoutlierCheck:
         standard: str,
         near: bool,
         verbose: bool,
-        outdir: Optional[Path] = None
+        outdir: Optional[Path] = None,
+        spatial_outputs_export: bool = False,
+        spatial_outputs_export_location: Optional[str] = None,
+        spatial_outputs_qajson: bool = True
     ) -> None:
         self.grid_file = grid_file
+        # resolved once here as absolute paths are used several times per run
+        self._grid_abs = str(grid_file.resolve())
         self.outdir = outdir
         self.standard = standard
         self.near = near
@@ -63,19 +176,29 @@ class GgoutlierCheck:
         self.points_outside_spec: int | None = None
         self.points_outside_spec_percentage: float | None = None
 
-        self.spatial_outputs_export = False
-        self.spatial_outputs_export_location = None
-        self.spatial_outputs_qajson = True
+        self.spatial_outputs_export = spatial_outputs_export
+        self.spatial_outputs_export_location = spatial_outputs_export_location
+        self.spatial_outputs_qajson = spatial_outputs_qajson
 
         self.max_geojson_points = 2000
         self.max_geojson_points_exceeded = False
 
-        self.geojson_point_features: list[geojson.Feature] = []
-        self.extents_geojson = geojson.MultiPolygon()
+        self.geojson_point_features: list[dict] = []
+        # file all outlier points are streamed to as they're read from the
+        # shp file, only set while processing the shp file
+        self.geojson_sink = None
+        # location of the exported sequence file containing all outlier
+        # points, None if it wasn't exported
+        self.geojson_seq_file: Optional[str] = None
+        self.extents_geojson: dict = {"type": "MultiPolygon", "coordinates": []}
 
         self.messages: list[str] = []
         self.passed = False
 
+        # when the check was run, set by run_checks
+        self.start_time: Optional[str] = None
+        self.end_time: Optional[str] = None
+
     def _get_output_file_location(
             self
         ) -> str:
@@ -89,30 +212,65 @@ class GgoutlierCheck:
         as command line args.
         """
         args: list[str] = []
-        args += ['-i', str(self.grid_file.absolute())]
+        args += ['-i', self._grid_abs]
         args += ['-near', str(self.near)]
         args += ['-standard', self.standard]
         if self.verbose:
             args += ['-verbose']
-        args += ['-odir', str(self.temp_base_dir.absolute())]
+        args += ['-odir', self._tmp_abs]
 
         return args
 
+    def _run_ggoutlier(self, cmd_args: list[str]) -> None:
+        """ Runs GGOutlier in a child process.
+        GGOutlier uses the root logger to generate a log file, and the report
+        GGOutlier generates reads this log file back assuming it's the root
+        logger that generated it. Running in a separate process gives GGOutlier
+        its own root logger without touching this process's logging.
+        """
+        result = subprocess.run(
+            [self.python_executable, '-c', _GGOUTLIER_MAIN, *cmd_args],
+            capture_output=True,
+            text=True,
+            cwd=self._tmp_abs
+        )
+        # relay what GGOutlier wrote to the console so it isn't lost, this
+        # leaves the app's own logging configuration untouched. stderr is
+        # relayed as warnings so these are seen even when the run succeeds.
+        for line in result.stdout.splitlines():
+            GGOUTLIER_LOG.debug(line)
+        for line in result.stderr.splitlines():
+            GGOUTLIER_LOG.warning(line)
+
+        if result.returncode != 0:
+            raise RuntimeError(
+                f"GGOutlier failed with exit code {result.returncode}\n"
+                f"{result.stderr}"
+            )
+
     def _move_tmp_dir(self):
         ol = self._get_output_file_location()
-        LOG.debug(f"Moving GGOutlier output: {str(self.temp_base_dir)} to {ol}")
-        distutils.dir_util.copy_tree(
-            str(self.temp_base_dir.absolute()),
-            ol)
+        src = self._tmp_abs
+        LOG.debug(f"Moving GGOutlier output: {src} to {ol}")
+        os.makedirs(os.path.dirname(ol), exist_ok=True)
+        try:
+            # a rename is all that's needed when the export location is on the
+            # same filesystem as the temp dir
+            os.rename(src, ol)
+        except OSError:
+            # cross device (EXDEV) or the destination already exists, so fall
+            # back to copying into the destination and removing the temp dir
+            shutil.copytree(src, ol, dirs_exist_ok=True, copy_function=shutil.copy)
+            shutil.rmtree(src)
 
     def _get_ggoutlier_shp(self) -> Path | None:
-        pattern = os.path.join(str(self.temp_base_dir.absolute()), '*.shp')
-        files = glob.glob(pattern)
-        if not files:
-            return None
         # Return the first file found, GGOutlier only generates one shp file
         # per input
-        return Path(files[0])
+        with os.scandir(self._tmp_abs) as entries:
+            for entry in entries:
+                if entry.name.endswith('.shp') and entry.is_file():
+                    return Path(entry.path)
+        return None
 
     def _get_ggoutlier_log(self) -> Path | None:
         path = self.temp_base_dir / 'GGOutlier_log.txt'
@@ -122,9 +280,178 @@ class GgoutlierCheck:
         # per input
         return path
 
+    def _add_point_feature(
+            self,
+            feature_id: int,
+            x: float,
+            y: float,
+            attributes: dict
+        ) -> None:
+        x = round(x, self.geojson_coordinate_precision)
+        y = round(y, self.geojson_coordinate_precision)
+
+        if feature_id > self.max_geojson_points:
+            # beyond the limit features are only written to the sequence file,
+            # so format the JSON directly rather than building a dict first
+            # the coordinates are serialized with orjson so non-finite values
+            # (TransformPoints gives inf for points it can't project) are
+            # written as null, the same as the dict form
+            self.geojson_sink.write(
+                f'\x1e{{"type":"Feature","id":{feature_id},"geometry":'
+                f'{{"type":"Point","coordinates":'.encode('utf-8')
+                + orjson.dumps([x, y]) + b'},"properties":'
+                + orjson.dumps(attributes) + b'}\n'
+            )
+            return
+
+        # plain dicts are used rather than geojson package objects, these
+        # can be serialized directly
+        feat = {
+            "type": "Feature",
+            "id": feature_id,
+            "geometry": {"type": "Point", "coordinates": [x, y]},
+            "properties": attributes,
+        }
+        if self.geojson_sink is not None:
+            # RFC 8142 GeoJSON text sequence, each feature is prefixed with a
+            # record separator
+            self.geojson_sink.write(b'\x1e' + orjson.dumps(feat) + b'\n')
+        self.geojson_point_features.append(feat)
+
+    def _check_point_limit(self, feature_id: int) -> bool:
+        """ Flags when the number of features read exceeds the maximum that
+        will be included in the geojson. Returns True if no more features need
+        to be read.
+        """
+        if feature_id <= self.max_geojson_points:
+            return False
+        if not self.max_geojson_points_exceeded:
+            # qajson gets large if too many points are included in the output.
+            # So limit the maximum anount of points. This doesnt effect the
+            # reported stats, only what is shown in the map widget.
+            self.max_geojson_points_exceeded = True
+            self.messages.append(
+                "Note: number of outliers identified exceeds that which can be "
+                "displayed within QAX. Please view shp file included in the "
+                "detailed spatial outputs for all outlier locations."
+            )
+            LOG.debug("Exceeded geojson point count")
+        # when a sink is available all features are still written to it
+        return self.geojson_sink is None
+
+    def _read_layer_batched(
+            self,
+            layer: ogr.Layer,
+            coord_trans: osr.CoordinateTransformation,
+            feature_id: int
+        ) -> int:
+        """ Reads the point features of a layer as columnar batches using
+        GDAL's Arrow stream interface (GDAL 3.6+). This avoids the several
+        SWIG calls per feature needed to read features one at a time.
+        Returns the next feature id.
+        """
+        layer_defn = layer.GetLayerDefn()
+        field_names = [
+            layer_defn.GetFieldDefn(i).GetName()
+            for i in range(layer_defn.GetFieldCount())
+        ]
+        geometry_column = layer.GetGeometryColumn() or 'wkb_geometry'
+
+        batch_size = 65536
+        if self.geojson_sink is None:
+            # only the features that will be included in the geojson are
+            # needed, so don't have GDAL read more than that into a batch
+            remaining = self.max_geojson_points + 1 - feature_id
+            batch_size = max(1, min(batch_size, remaining))
+
+        stream = layer.GetArrowStreamAsNumPy(
+            options=[
+                'INCLUDE_FID=NO',
+                f'MAX_FEATURES_IN_BATCH={batch_size}',
+                # otherwise date/time fields are returned as datetime64
+                'DATETIME_AS_STRING=YES',
+            ]
+        )
+        for batch in stream:
+            # collect the points of this batch so they can all be transformed
+            # in a single call
+            feature_ids: list[int] = []
+            rows: list[int] = []
+            points: list[tuple[float, float, float]] = []
+            limit_reached = False
+            for row, wkb in enumerate(batch[geometry_column]):
+                xy = _wkb_point_xy(wkb)
+                if xy is not None:
+                    feature_ids.append(feature_id)
+                    rows.append(row)
+                    points.append((xy[0], xy[1], 0.0))
+
+                feature_id += 1
+
+                if self._check_point_limit(feature_id):
+                    limit_reached = True
+                    break
+
+            if points:
+                # convert each column to a list of python values once per batch
+                columns = [
+                    (name, _column_values(batch[name])) for name in field_names
+                ]
+                # convert to geojson CRS
+                transformed = coord_trans.TransformPoints(points)
+                for fid, row, (x, y, _) in zip(feature_ids, rows, transformed):
+                    attributes = {name: values[row] for name, values in columns}
+                    self._add_point_feature(fid, x, y, attributes)
+
+            if limit_reached:
+                break
+
+        return feature_id
+
+    def _read_layer_features(
+            self,
+            layer: ogr.Layer,
+            coord_trans: osr.CoordinateTransformation,
+            feature_id: int
+        ) -> int:
+        """ Reads the point features of a layer one feature at a time. Only
+        used when the GDAL version doesn't support Arrow streams.
+        Returns the next feature id.
+        """
+        feature = layer.GetNextFeature()
+        while feature:
+            # Extract feature attributes
+            attributes = {}
+            for i in range(feature.GetFieldCount()):
+                field_name = feature.GetFieldDefnRef(i).GetName()
+                field_value = feature.GetField(i)
+                attributes[field_name] = field_value
+
+            # Extract feature geometry
+            geometry = feature.GetGeometryRef()
+            if geometry.GetGeometryName() == 'POINT':
+                # Extract the point coordinates in the shp file CRS
+                x = geometry.GetX()
+                y = geometry.GetY()
+                # convert to geojson CRS
+                x, y = coord_trans.TransformPoint(x, y, 0.0)[:2]
+                self._add_point_feature(feature_id, x, y, attributes)
+
+            feature_id += 1
+
+            if self._check_point_limit(feature_id):
+                break
+
+            # Move to the next feature
+            feature = layer.GetNextFeature()
+
+        return feature_id
+
     def _process_ggoutlier_shp(self, shp_file: Path) -> None:
         LOG.debug(f"Processing GGOutlier shp: {str(shp_file)}")
-        fn = str(shp_file.absolute())
+        fn = str(shp_file)
+        from osgeo import ogr
+
         datasource = ogr.Open(fn)
         if not datasource:
             raise Exception(f"Could not open file: {fn}")
@@ -140,83 +467,22 @@ class GgoutlierCheck:
 
             layer_spatial_ref = layer.GetSpatialRef().ExportToWkt()
 
-            # setup a coordinate transform, we need points in WSG84 (4326)
-            # for geojson
-            src_proj = osr.SpatialReference()
-            src_proj.ImportFromWkt(layer_spatial_ref)
-            dst_proj = osr.SpatialReference()
-            dst_proj.ImportFromEPSG(4326)
-            dst_proj.SetAxisMappingStrategy(osr.OAMS_TRADITIONAL_GIS_ORDER)
-            coord_trans = osr.CoordinateTransformation(src_proj, dst_proj)
-
-            feature = layer.GetNextFeature()
-            while feature:
-                # Extract feature attributes
-                attributes = {}
-                for i in range(feature.GetFieldCount()):
-                    field_name = feature.GetFieldDefnRef(i).GetName()
-                    field_value = feature.GetField(i)
-                    attributes[field_name] = field_value
-
-                # Extract feature geometry
-                geometry = feature.GetGeometryRef()
-                if geometry.GetGeometryName() == 'POINT':
-                    # Extract the point coordinates in the shp file CRS
-                    x = geometry.GetX()
-                    y = geometry.GetY()
-                    # convert to geojson CRS
-                    x, y = coord_trans.TransformPoint(x, y, 0.0)[:2]
-                    geom = geojson.geometry.Point([x, y])
-                    feat = geojson.Feature(
-                        id=feature_id,
-                        geometry=geom,
-                        properties=attributes
-                    )
-                    self.geojson_point_features.append(feat)
-
-                feature_id += 1
+            # we need points in WSG84 (4326) for geojson
+            coord_trans = _get_transform_to_wgs84(layer_spatial_ref)
 
-                if feature_id > self.max_geojson_points:
-                    # qajson gets large if too many points are included in the output.
-                    # So limit the maximum anount of points. This doesnt effect the
-                    # reported stats, only what is shown in the map widget.
-                    self.max_geojson_points_exceeded = True
-                    self.messages.append(
-                        "Note: number of outliers identified exceeds that which can be "
-                        "displayed within QAX. Please view shp file included in the "
-                        "detailed spatial outputs for all outlier locations."
-                    )
-                    LOG.debug("Exceeded geojson point count")
-                    break
+            if hasattr(layer, 'GetArrowStreamAsNumPy'):
+                feature_id = self._read_layer_batched(layer, coord_trans, feature_id)
+            else:
+                feature_id = self._read_layer_features(layer, coord_trans, feature_id)
 
-                # Move to the next feature
-                feature = layer.GetNextFeature()
+            if self.max_geojson_points_exceeded and self.geojson_sink is None:
+                # nothing more will be included in the geojson, so there's no
+                # need to read the remaining layers
+                break
 
         # Cleanup
         datasource = None
 
-    def __process_ggoutlier_log_line(self, log_line: str) -> None:
-        """ Extracts information from a log line if relevant
-        """
-        if ":Points checked:" in log_line:
-            # process line formatted like
-            #     INFO:root:Points checked: 28,613,210
-            s = log_line.split(":Points checked:",1)[1].strip()
-            s = s.replace(',','')
-            self.points_total = int(s)
-        elif ":Points outside specification:" in log_line:
-            # process line formatted like
-            #     INFO:root:Points outside specification: 1,250
-            s = log_line.split(":Points outside specification:",1)[1].strip()
-            s = s.replace(',','')
-            self.points_outside_spec = int(s)
-        elif ":Percentage outside specification:" in log_line:
-            # process line formatted like
-            #     INFO:root:Percentage outside specification: 0.0043686
-            s = log_line.split(":Percentage outside specification:",1)[1].strip()
-            s = s.replace(',','')
-            self.points_outside_spec_percentage = float(s)
-
     def _process_ggoutlier_log(self, log_file: Path) -> None:
         """ Reads summary information from GGOutlier log file to be included
         in QAX details. This information is also used to determine if check
@@ -224,47 +490,70 @@ class GgoutlierCheck:
         """
         LOG.debug(f"Processing GGOutlier log: {str(log_file)}")
 
-        with open(log_file) as fp:
-            for line in fp:
-                try:
-                    self.__process_ggoutlier_log_line(line)
-                except Exception as ex:
-                    raise RuntimeError(f"Error parsing log line: {line}") from ex
+        with open(log_file, 'rb') as fp:
+            data = fp.read()
+
+        # process lines formatted like
+        #     INFO:root:Points checked: 28,613,210
+        #     INFO:root:Points outside specification: 1,250
+        #     INFO:root:Percentage outside specification: 0.0043686
+        # every line is processed, so the last value of a repeated metric is
+        # the one used
+        for match in _LOG_RE.finditer(data):
+            metric = match['metric']
+            try:
+                attr_name, convert = _LOG_METRICS[metric]
+                value = match['value'].strip().translate(None, _DROP_COMMAS)
+                setattr(self, attr_name, convert(value))
+            except Exception as ex:
+                raise RuntimeError(
+                    f"Error parsing log line: {match.group(0).decode(errors='replace')}"
+                ) from ex
 
-    def _extract_extents(self) -> geojson.MultiPolygon:
+    def _extract_extents(self) -> dict:
         """ Generates geojson extents from input grid file
         """
-        extents: geojson.MultiPolygon | None = None
+        import rasterio
+        from rasterio.warp import transform_bounds
+
         with rasterio.open(str(self.grid_file)) as src_grid:
-            bounds = src_grid.bounds
-
-            # need to transform into wsg84 for geojson
-            ogr_srs = osr.SpatialReference()
-            ogr_srs.ImportFromWkt(src_grid.crs.to_wkt())
-            ogr_srs_out = osr.SpatialReference()
-            ogr_srs_out.ImportFromEPSG(4326)
-            transform = osr.CoordinateTransformation(ogr_srs, ogr_srs_out)
-
-            transformed_bounds = transform.TransformBounds(
-                bounds.left,
-                bounds.bottom,
-                bounds.right,
-                bounds.top,
-                2
+            # need to transform into wsg84 for geojson, transform_bounds
+            # returns these in lon/lat order
+            minx, miny, maxx, maxy = transform_bounds(
+                src_grid.crs,
+                'EPSG:4326',
+                *src_grid.bounds,
+                densify_pts=21
             )
-            minx, miny, maxx, maxy = transformed_bounds
-
-            extents = geojson.MultiPolygon([[[
-                (miny, minx),
-                (miny, maxx),
-                (maxy, maxx),
-                (maxy, minx),
-            ]]])
+
+        # geojson requires the first and last positions of the ring to be
+        # the same
+        extents = {
+            "type": "MultiPolygon",
+            "coordinates": [[[
+                [minx, miny],
+                [maxx, miny],
+                [maxx, maxy],
+                [minx, maxy],
+                [minx, miny],
+            ]]],
+        }
         return extents
 
-    def run(self) -> None:
+    @classmethod
+    def shared_workdir(cls) -> Path:
+        """ Creates a temp dir that can be shared as the parent of the temp dirs
+        for a batch of checks (see `run`). The caller is responsible for
+        removing it once the batch is complete.
         """
-        Runs GGOutlier over all the input grid files that have been provided
+        return Path(tempfile.mkdtemp(prefix='ggoutlier-batch-'))
+
+    def run(self, parent_tmp: Optional[Path] = None) -> None:
+        """
+        Runs GGOutlier over all the input grid files that have been provided.
+        If parent_tmp is given the GGOutlier outputs are written to a temp dir
+        within it, and are left for the caller to clean up along with
+        parent_tmp.
         """
         LOG.info(f"Grid file: {self.grid_file}")
         LOG.info(f"Standard: {self.standard}")
@@ -273,33 +562,28 @@ class GgoutlierCheck:
 
         LOG.info(f"Output folder: {self.outdir}")
 
+        if self.python_executable is None:
+            raise RuntimeError(
+                "GGOutlier is run with a python interpreter, but none is "
+                "available in a frozen app. Set "
+                "GgoutlierCheck.python_executable to one with ggoutlier "
+                "installed."
+            )
+
         self.extents_geojson = self._extract_extents()
 
-        # import contextlib
-        # with contextlib.nullcontext(tempfile.mkdtemp()) as tmpdir:
-        # Note: TemporaryDirectory is automatically deleted, use the above to debug
-        # as tempfile.mkdtemp isn't automatically deleted
-        with tempfile.TemporaryDirectory(suffix=".ggoutlier-check") as tmpdir:
-            self.temp_base_dir = Path(tmpdir)
+        # Note: the temp dir is either moved to the export location (see
+        # _move_tmp_dir) or removed in the finally block below. Comment out the
+        # rmtree call to keep GGOutlier outputs for debugging.
+        self.temp_base_dir = Path(
+            tempfile.mkdtemp(suffix=".ggoutlier-check", dir=parent_tmp))
+        self._tmp_abs = str(self.temp_base_dir.resolve())
+        try:
             cmd_args = self.__get_ggoutlier_cmd_args()
             LOG.debug(f"GGOutlier args: {' '.join(cmd_args)}")
 
-            # GGOutlier uses the root logger to generate a log file
-            # The report GGOutlier generates reads this log file and extracts
-            # file paths from it. It assumes it's the root logger that has
-            # generated the log file.
-            # This means we have to temporarily switch out the root logger
-            # and switch back (see finally block below) once GGOutlier is complete
-            old_root_logger = logging.root
-            logging.root = logging.Logger("root", level=logging.INFO)
-
-            try:
-                # run GGOutlier
-                ggoutlier.main(cmd_args)
-            except Exception as ex:
-                raise ex
-            finally:
-                logging.root = old_root_logger
+            # run GGOutlier
+            self._run_ggoutlier(cmd_args)
 
             # we use the points in the shp generated by GGOutlier to populated the geojson
             # data that gets included in the checks QAJSON
@@ -307,6 +591,16 @@ class GgoutlierCheck:
             if not shp_file:
                 self.messages.append("Unable to find GGOutlier generated shp file, results cannot be extracted")
                 LOG.info("Unable to find GGOutlier generated shp file, results cannot be extracted")
+            elif self.spatial_outputs_export:
+                # the temp dir becomes the detailed spatial outputs, so write
+                # the sequence file into it
+                seq_file = self.temp_base_dir / self.geojson_seq_filename
+                with open(seq_file, 'wb') as sink:
+                    self.geojson_sink = sink
+                    try:
+                        self._process_ggoutlier_shp(shp_file)
+                    finally:
+                        self.geojson_sink = None
             else:
                 self._process_ggoutlier_shp(shp_file)
 
@@ -320,8 +614,16 @@ class GgoutlierCheck:
                 self._process_ggoutlier_log(log_file)
 
             if self.spatial_outputs_export:
-                # if we don't move the temp data it will be automatically cleaned up
+                # moving the temp dir means there's nothing left to clean up
                 self._move_tmp_dir()
+                if shp_file:
+                    self.geojson_seq_file = os.path.join(
+                        self._get_output_file_location(),
+                        self.geojson_seq_filename
+                    )
+        finally:
+            if parent_tmp is None and self.temp_base_dir.exists():
+                shutil.rmtree(self.temp_base_dir, ignore_errors=True)
 
         # In future a threshold may be more appropriate, this will fail the check even
         # if only one outlier is found
@@ -329,3 +631,122 @@ class GgoutlierCheck:
             self.passed = False
         else:
             self.passed = True
+
+
+def _iso_now() -> str:
+    """ Current local time formatted for the qajson execution details """
+    return datetime.now().isoformat(timespec='microseconds')
+
+
+class _RelayHandler(logging.Handler):
+    """ Passes log records forwarded from the worker processes to the logger
+    of the same name in this process, so they're handled by this process's
+    logging configuration.
+    """
+
+    def emit(self, record: logging.LogRecord) -> None:
+        logger = logging.getLogger(record.name)
+        if logger.isEnabledFor(record.levelno):
+            logger.handle(record)
+
+
+def _init_worker(log_queue: multiprocessing.Queue, level: int) -> None:
+    """ Worker process initializer used by run_checks. Spawned workers have no
+    logging configuration, so all records are forwarded to the parent.
+    """
+    root = logging.getLogger()
+    root.handlers = [QueueHandler(log_queue)]
+    root.setLevel(level)
+
+
+def _run_one(check: GgoutlierCheck, parent_tmp: Optional[Path]) -> dict:
+    """ Worker process function used by run_checks. Only the results are
+    returned to the parent process, not the whole check.
+    """
+    check.start_time = _iso_now()
+    try:
+        check.run(parent_tmp)
+    finally:
+        check.end_time = _iso_now()
+    return {name: getattr(check, name) for name in _RESULT_ATTRIBUTES}
+
+
+def _run_checks_in_process(
+        checks: list[GgoutlierCheck],
+        is_stopped: Optional[Callable[[], bool]] = None
+    ) -> list[Optional[BaseException]]:
+    """ Runs the checks one after the other in this process, see run_checks.
+    """
+    errors: list[Optional[BaseException]] = [None] * len(checks)
+    for index, check in enumerate(checks):
+        if is_stopped is not None and is_stopped():
+            errors[index] = CancelledError()
+            continue
+        try:
+            _run_one(check, None)
+        except Exception as ex:
+            errors[index] = ex
+    return errors
+
+
+def run_checks(
+        checks: list[GgoutlierCheck],
+        max_workers: Optional[int] = None,
+        is_stopped: Optional[Callable[[], bool]] = None
+    ) -> list[Optional[BaseException]]:
+    """ Runs each of the checks in a separate worker process, the results of
+    each check are copied back onto the check objects passed in. A single
+    check, or all checks when running in a frozen app, are run in this
+    process.
+    Returns a list with the exception raised by each check, or None if the
+    check completed. If is_stopped returns True any checks that haven't
+    started are cancelled, these get a CancelledError.
+    """
+    if len(checks) <= 1:
+        # GGOutlier already runs in its own process, a worker process would
+        # only add another interpreter start up
+        return _run_checks_in_process(checks, is_stopped)
+    if getattr(sys, 'frozen', False):
+        # spawned workers would start the frozen app rather than python
+        return _run_checks_in_process(checks, is_stopped)
+
+    errors: list[Optional[BaseException]] = [None] * len(checks)
+    # all checks share one parent temp dir, removed once at the end
+    parent_tmp = GgoutlierCheck.shared_workdir()
+    # spawn (rather than fork) keeps GDAL's global state out of the workers
+    mp_context = multiprocessing.get_context('spawn')
+    # log records of the workers are relayed to the loggers of this process,
+    # workers only forward the levels enabled here
+    log_queue = mp_context.Queue()
+    listener = QueueListener(log_queue, _RelayHandler())
+    level = min(LOG.getEffectiveLevel(), GGOUTLIER_LOG.getEffectiveLevel())
+    listener.start()
+    try:
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=mp_context,
+            initializer=_init_worker,
+            initargs=(log_queue, level)
+        ) as executor:
+            futures = {
+                executor.submit(_run_one, check, parent_tmp): index
+                for index, check in enumerate(checks)
+            }
+            for future in as_completed(futures):
+                index = futures[future]
+                try:
+                    results = future.result()
+                except Exception as ex:
+                    # includes the CancelledError of cancelled checks
+                    errors[index] = ex
+                else:
+                    for name, value in results.items():
+                        setattr(checks[index], name, value)
+
+                if is_stopped is not None and is_stopped():
+                    for pending in futures:
+                        pending.cancel()
+    finally:
+        listener.stop()
+        shutil.rmtree(parent_tmp, ignore_errors=True)
+    return errors
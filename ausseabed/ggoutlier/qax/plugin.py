@@ -1,22 +1,145 @@
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
-from ggoutlier import cloud2tif
-import geojson
+import functools
 import logging
 import os
-import rasterio
 import traceback
-from typing import Callable, Any
+from typing import Callable, Any, Iterator
 from pathlib import Path
 
 from hyo2.qax.lib.plugin import QaxCheckToolPlugin, QaxCheckReference, \
     QaxFileType
-from ausseabed.qajson.model import QajsonRoot, QajsonDataLevel, QajsonCheck, \
-    QajsonFile, QajsonInputs, QajsonExecution, QajsonOutputs
+from ausseabed.qajson.model import QajsonRoot, QajsonCheck, \
+    QajsonExecution, QajsonOutputs
 
-from ausseabed.ggoutlier.lib.ggoutlier_check import GgoutlierCheck
+from ausseabed.ggoutlier.lib.ggoutlier_check import GgoutlierCheck, run_checks
+
+# Note: osgeo and ggoutlier are imported where they're used. QAX
+# imports all plugins at startup, and importing these loads GDAL.
 
 LOG = logging.getLogger(__name__)
 
+# GDAL config used while reading raster metadata. This avoids listing the
+# directory of each file on open, and caches reads of remote (/vsicurl/ etc)
+# files. Set through osgeo, as it's the GDAL used by osgeo that reads the
+# metadata (rasterio wheels bundle their own GDAL).
+GDAL_ENV_OPTIONS = {
+    'GDAL_DISABLE_READDIR_ON_OPEN': 'TRUE',
+    'VSI_CACHE': 'TRUE',
+    'CPL_VSIL_CURL_ALLOWED_EXTENSIONS': '.tif,.tiff',
+}
+
+
+@contextmanager
+def _gdal_config(options: dict[str, str]) -> Iterator[None]:
+    """ Sets GDAL config options for the current thread, restoring their
+    previous values on exit. gdal.config_options does the same, but is only
+    available from GDAL 3.7.
+    """
+    from osgeo import gdal
+
+    previous = {k: gdal.GetThreadLocalConfigOption(k, None) for k in options}
+    for key, value in options.items():
+        gdal.SetThreadLocalConfigOption(key, value)
+    try:
+        yield
+    finally:
+        for key, value in previous.items():
+            gdal.SetThreadLocalConfigOption(key, value)
+
+
+@functools.lru_cache(maxsize=256)
+def _cached_band_names(path: str, mtime: float) -> tuple[str | None, ...]:
+    # mtime is only included in the cache key, so a modified file is reread
+    from ggoutlier import cloud2tif
+
+    return tuple(cloud2tif.getbandnames(path))
+
+
+def _iso_now() -> str:
+    """ Current local time formatted for the qajson execution details """
+    return datetime.now().isoformat(timespec='microseconds')
+
+
+def _get_raster_details(path: str) -> tuple[int, int, list[str | None]]:
+    """ Gets the width, height and band descriptions of a raster file, from a
+    single open of the GDAL dataset. Bands without a description are None.
+    """
+    from osgeo import gdal
+
+    dataset = gdal.Open(path)
+    if dataset is None:
+        raise RuntimeError(f"Could not open file: {path}")
+    descriptions = [
+        dataset.GetRasterBand(i).GetDescription() or None
+        for i in range(1, dataset.RasterCount + 1)
+    ]
+    details = (dataset.RasterXSize, dataset.RasterYSize, descriptions)
+    dataset = None
+    return details
+
+
+@functools.lru_cache(maxsize=256)
+def _cached_is_cog(path: str, mtime: float) -> bool | None:
+    try:
+        # GDAL's sample scripts aren't included in all GDAL installs
+        from osgeo_utils.samples.validate_cloud_optimized_geotiff import \
+            validate as validate_cog
+    except ImportError:
+        return None
+    try:
+        _, errors, _ = validate_cog(path, full_check=False)
+    except Exception:
+        # raised for files that aren't GeoTIFFs
+        return False
+    return not errors
+
+
+def _is_local_non_cog(path: str) -> bool:
+    """ Checks if a local raster file is not a cloud optimised GeoTIFF. False
+    is returned if this can't be determined.
+    """
+    if not os.path.isfile(path):
+        # remote files (/vsicurl/ etc) aren't checked
+        return False
+    return _cached_is_cog(os.path.abspath(path), os.path.getmtime(path)) is False
+
+
+def _has_depth_name(path: Path) -> bool:
+    """ Checks if the filename identifies the raster as depth data, this
+    doesn't require the file to be opened.
+    """
+    return 'depth' in path.name.lower()
+
+
+def _is_depth_grid(path: Path) -> bool:
+    """ Checks if the raster file contains depth data """
+    # if it has depth in the filename then use it
+    if _has_depth_name(path):
+        return True
+
+    # ggoutlier include some util classes we can use to get details from the
+    # raster file. The GDAL config is set here as it's specific to each thread.
+    with _gdal_config(GDAL_ENV_OPTIONS):
+        band_names = _get_band_names(str(path))
+
+    # if it's a single or multiband tif, and depth is one of the band names
+    # included in the tifs metadata, then use it
+    return any(name and name.lower() == 'depth' for name in band_names)
+
+
+def _get_band_names(path: str) -> tuple[str | None, ...]:
+    """ Gets the band names of a raster file. These are cached as reading them
+    requires opening the file, and QAX asks for them repeatedly for the
+    same files. Remote files (/vsicurl/ etc) have no mtime, so aren't cached.
+    """
+    if not os.path.isfile(path):
+        from ggoutlier import cloud2tif
+
+        return tuple(cloud2tif.getbandnames(path))
+    return _cached_band_names(os.path.abspath(path), os.path.getmtime(path))
+
 
 class GgoutlierQaxPlugin(QaxCheckToolPlugin):
 
@@ -62,84 +185,84 @@ class GgoutlierQaxPlugin(QaxCheckToolPlugin):
     def checks(self) -> list[QaxCheckReference]:
         return self._check_references
 
-    def _get_param_value(self, param_name: str, check: QajsonCheck) -> Any:
-        ''' Gets a parameter value from the QajsonCheck based on the parameter
-        name. Will return None if the parameter is not found.
+    def _get_param_values(self, check: QajsonCheck) -> dict[str, Any]:
+        ''' Gets all parameter values from the QajsonCheck indexed by parameter
+        name.
         '''
-        param = next(
-            (
-                p
-                for p in check.inputs.params
-                if p.name == param_name
-            ),
-            None
-        )
-        if param is None:
-            return None
-        else:
-            return param.value
-
+        return {p.name: p.value for p in check.inputs.params}
 
-    def _run_ggoutlier_check(self, check: QajsonCheck):
+    def _select_grid_file(self, check: QajsonCheck) -> Path | None:
+        ''' Gets the input file the check needs to run. In this case we get
+        the first grid file that contains a depth band.
+        '''
+        candidates = [
+            Path(f.path)
+            for f in check.inputs.files
+            if f.file_type == 'Survey DTMs'
+        ]
+        # files before the first one with depth in its name need to be
+        # opened to check for a depth band, none after it do
+        name_match = next(
+            (i for i, c in enumerate(candidates) if _has_depth_name(c)), None)
+        to_probe = candidates[:name_match]
+        fallback = None if name_match is None else candidates[name_match]
+        if not to_probe:
+            return fallback
+
+        # the candidates are probed in parallel as this is mostly waiting on
+        # file IO, but the first match in input order is still the one used
+        executor = ThreadPoolExecutor(max_workers=8)
+        futures = [executor.submit(_is_depth_grid, c) for c in to_probe]
+        try:
+            for candidate, future in zip(to_probe, futures):
+                if future.result():
+                    return candidate
+        finally:
+            # don't wait for, or start, probes of the files after the match
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        return fallback
+
+    def _prepare_ggoutlier_check(
+            self,
+            check: QajsonCheck
+        ) -> GgoutlierCheck | None:
+        ''' Creates the GgoutlierCheck that will run the given QajsonCheck.
+        Returns None if the check can't be run, in which case the aborted
+        status has already been recorded in the check outputs.
+        '''
         # get the parameter values the check needs to run
-        input_standard = self._get_param_value(
-            'Standard',
-            check
-        )
-        input_near = int(self._get_param_value(
-            'Near',
-            check
-        ))
-        input_verbose = bool(self._get_param_value(
-            'Verbose',
-            check
-        ))
-
-        # get the input files the check needs to run. In this case we get
-        # the first grid file that contains a depth band
-        grid_file = None
-        for f in check.inputs.files:
-            if f.file_type == 'Survey DTMs':
-                qajson_input_file = Path(f.path)
-                # ggoutlier include some util classes we can use to get details
-                # from the raster file
-                band_names = cloud2tif.getbandnames(f.path)
-                band_names = [name.lower() for name in band_names if name is not None]
-
-                # if there's a single band tif, and it has depth in the filename
-                # then use it
-                if 'depth' in qajson_input_file.name.lower() and len(band_names) == 1:
-                    grid_file = qajson_input_file
-                    break
-
-                # if it's a single or multiband tif, and depth is one of the band
-                # names included in the tifs metadata, then use it
-                if 'depth' in band_names:
-                    grid_file = qajson_input_file
-                    break
-
-        output_details = QajsonOutputs()
-        check.outputs = output_details
-
-        start_time = datetime.now().strftime("%Y-%m-%dT%H:%M:%S.%f")
-        execution_details = QajsonExecution(
-            start=start_time,
-            end=None,
-            status='running',
-            error=None
-        )
-        check.outputs.execution = execution_details
+        params = self._get_param_values(check)
+        input_standard = params.get('Standard')
+        input_near = int(params.get('Near'))
+        input_verbose = bool(params.get('Verbose'))
+
+        grid_file = self._select_grid_file(check)
+
+        # validating the COG layout opens the file again, so this hint is only
+        # given when debug logging is enabled
+        if grid_file is not None and LOG.isEnabledFor(logging.DEBUG):
+            with _gdal_config(GDAL_ENV_OPTIONS):
+                if _is_local_non_cog(str(grid_file)):
+                    LOG.debug(
+                        f"{grid_file} is not a cloud optimised GeoTIFF, "
+                        "converting it with 'gdal_translate -of COG -co "
+                        "COMPRESS=DEFLATE' may improve read performance"
+                    )
 
         if grid_file is None:
             msg = "Missing input depth data"
             LOG.info(msg)
-            execution_details.status = "aborted"
-            execution_details.error = msg
-
-        if execution_details.status == "aborted":
-            msg = "Aborting GGOutlier Check"
-            LOG.info(msg)
-            return
+            check.outputs = QajsonOutputs(
+                execution=QajsonExecution(
+                    start=_iso_now(),
+                    end=None,
+                    status='aborted',
+                    error=msg
+                )
+            )
+            LOG.info("Aborting GGOutlier Check")
+            return None
 
         if self.spatial_outputs_export:
             outdir = Path(self.spatial_outputs_export_location)
@@ -151,34 +274,61 @@ class GgoutlierQaxPlugin(QaxCheckToolPlugin):
             standard=input_standard,
             near=input_near,
             verbose=input_verbose,
-            outdir=outdir
+            outdir=outdir,
+            spatial_outputs_export=self.spatial_outputs_export,
+            spatial_outputs_export_location=self.spatial_outputs_export_location,
+            spatial_outputs_qajson=self.spatial_outputs_qajson
         )
-        ggo_check.spatial_outputs_export = self.spatial_outputs_qajson
-        ggo_check.spatial_outputs_export_location = self.spatial_outputs_export_location
-        ggo_check.spatial_outputs_qajson = self.spatial_outputs_qajson
-
-        try:
-            # now run the check
-            ggo_check.run()
-
-            execution_details.status = 'completed'
-        except Exception as ex:
-            execution_details.status = 'failed'
-            execution_details.error = traceback.format_exc()
-        finally:
-            execution_details.end = datetime.now().strftime("%Y-%m-%dT%H:%M:%S.%f")
-
-        if execution_details.status == 'failed':
+        return ggo_check
+
+    def _populate_ggoutlier_outputs(
+            self,
+            check: QajsonCheck,
+            ggo_check: GgoutlierCheck,
+            start_time: str,
+            error: BaseException | None
+        ) -> None:
+        ''' Adds the results of a GgoutlierCheck that has been run to the
+        QajsonCheck outputs. error is the exception raised when running the
+        check, if any. start_time is when the batch of checks started, it's
+        only used if the check didn't record its own start and end times.
+        '''
+        if ggo_check.start_time is not None:
+            start_time = ggo_check.start_time
+            end_time = ggo_check.end_time
+        else:
+            end_time = _iso_now()
+
+        if isinstance(error, CancelledError):
+            # the user stopped the checks before this one was started
+            check.outputs = QajsonOutputs(
+                execution=QajsonExecution(
+                    start=start_time,
+                    end=end_time,
+                    status='aborted',
+                    error="GGOutlier Check was stopped"
+                )
+            )
+            return
+        elif error is not None:
             # no need to populate results as there are none
+            check.outputs = QajsonOutputs(
+                execution=QajsonExecution(
+                    start=start_time,
+                    end=end_time,
+                    status='failed',
+                    error="".join(traceback.format_exception(error))
+                )
+            )
             return
 
         # now add the result data to the qajson output details so that it's
         # captured and presented to the user
         if ggo_check.passed:
-            output_details.check_state = 'pass'
+            check_state = 'pass'
             state_msg = f"No outliers found, {ggo_check.points_total} were checked"
         else:
-            output_details.check_state = 'fail'
+            check_state = 'fail'
             state_msg = (
                 f"{ggo_check.points_outside_spec} outliers were found in a total "
                 f"of {ggo_check.points_total} points. This represents a percentage of "
@@ -189,24 +339,39 @@ class GgoutlierQaxPlugin(QaxCheckToolPlugin):
         messages.append(state_msg)
         messages.extend(ggo_check.messages)
 
-        output_details.messages = messages
-
         # use the data dict to stash some misc information generated by the check
         data = {}
 
-        if self.spatial_outputs_qajson and execution_details.status == 'completed':
-            # then we can include some geojson in the qajson output
-            json_map_feature = geojson.FeatureCollection(ggo_check.geojson_point_features)
-            json_map = geojson.mapping.to_mapping(json_map_feature)
-            data['map'] = json_map
+        if self.spatial_outputs_qajson:
+            # then we can include some geojson in the qajson output. The
+            # features are already plain dicts so they're used as is, rather
+            # than being copied into geojson package objects
+            data['map'] = {
+                "type": "FeatureCollection",
+                "features": ggo_check.geojson_point_features,
+            }
             data['extents'] = ggo_check.extents_geojson
 
-        if execution_details.status == 'completed':
-            data['points_outside_spec'] = ggo_check.points_outside_spec
-            data['points_total'] = ggo_check.points_total
-            data['points_outside_spec_percentage'] = ggo_check.points_outside_spec_percentage
-
-        output_details.data = data
+        if ggo_check.geojson_seq_file is not None:
+            # the map only includes a limited number of points, all outlier
+            # points are in this GeoJSON text sequence file
+            data['map_path'] = ggo_check.geojson_seq_file
+
+        data['points_outside_spec'] = ggo_check.points_outside_spec
+        data['points_total'] = ggo_check.points_total
+        data['points_outside_spec_percentage'] = ggo_check.points_outside_spec_percentage
+
+        check.outputs = QajsonOutputs(
+            execution=QajsonExecution(
+                start=start_time,
+                end=end_time,
+                status='completed',
+                error=None
+            ),
+            check_state=check_state,
+            messages=messages,
+            data=data
+        )
 
     def run(
         self,
@@ -222,17 +387,40 @@ class GgoutlierQaxPlugin(QaxCheckToolPlugin):
         # find the input details for this plugin here
         sp_qajson_checks = qajson.qa.survey_products.checks
 
+        qajson_checks: list[QajsonCheck] = []
+        ggo_checks: list[GgoutlierCheck] = []
         for qajson_check in sp_qajson_checks:
             if is_stopped is not None and is_stopped():
-                # stop looping through checks if the user has stopped them
+                # stop looping through checks if the user has stopped them,
+                # any already prepared are cancelled below
                 break
             # loop through all the checks, this will include checks implemented in
             # other plugins (we need to skip these)
             if qajson_check.info.id == GgoutlierCheck.id:
-                # then run the ggoutlier check
-                self._run_ggoutlier_check(qajson_check)
+                # then setup the ggoutlier check
+                ggo_check = self._prepare_ggoutlier_check(qajson_check)
+                if ggo_check is not None:
+                    qajson_checks.append(qajson_check)
+                    ggo_checks.append(ggo_check)
             # other checks would be added here
 
+        if ggo_checks:
+            start_time = _iso_now()
+            if is_stopped is not None and is_stopped():
+                # the user has stopped the checks before any were started
+                errors = [CancelledError() for _ in ggo_checks]
+            else:
+                # each check is an independent cpu bound GGOutlier run, so
+                # they're run in parallel worker processes
+                errors = run_checks(
+                    ggo_checks,
+                    max_workers=os.cpu_count(),
+                    is_stopped=is_stopped
+                )
+            for qajson_check, ggo_check, error in zip(qajson_checks, ggo_checks, errors):
+                self._populate_ggoutlier_outputs(
+                    qajson_check, ggo_check, start_time, error)
+
         if qajson_update_callback is not None:
             qajson_update_callback()
 
@@ -241,25 +429,29 @@ class GgoutlierQaxPlugin(QaxCheckToolPlugin):
         """ Return some details about the raster file that's been provided. In this
         case a list of the bands, and the resolution of the dataset.
         """
-        res: list[str] = []
+        stem = Path(filename).stem
+
+        with _gdal_config(GDAL_ENV_OPTIONS):
+            width, height, band_names = _get_raster_details(filename)
+
+        size = f"{width}{chr(0x00D7)}{height}"
+        if band_names == [None]:
+            # a single band without a name, the product is typically given in
+            # the filename
+            stem_lc = stem.lower()
+            product = next(
+                (p for p in ('depth', 'density', 'uncertainty') if p in stem_lc),
+                None
+            )
+            if product is not None:
+                return f"{product}\n{size}"
 
-        band_names: list[str] = cloud2tif.getbandnames(filename)
+        res: list[str] = []
         for band_name in band_names:
             if band_name is None:
-                if 'depth' in Path(filename).stem.lower():
-                    res.append('depth')
-                elif 'density' in Path(filename).stem.lower():
-                    res.append('density')
-                elif 'uncertainty' in Path(filename).stem.lower():
-                    res.append('uncertainty')
-                else:
-                    res.append(f"Could not identify name in: {Path(filename).stem}")
+                res.append(f"Could not identify name in: {stem}")
             else:
                 res.append(band_name)
-
-        with rasterio.open(filename) as dataset:
-            width = dataset.width
-            height = dataset.height
-            res.append(f"{width}{chr(0x00D7)}{height}")
+        res.append(size)
 
         return "\n".join(res)
@@ -29,7 +29,8 @@ setup(
     package_data={},
     install_requires=[
         'ausseabed.qajson',
-        'ggoutlier'
+        'ggoutlier',
+        'orjson'
     ],
     tests_require=['pytest'],
 )
@@ -0,0 +1,316 @@
+from concurrent.futures import CancelledError
+from pathlib import Path
+import errno
+import io
+import json
+import os
+import struct
+import time
+
+import pytest
+
+from ausseabed.ggoutlier.lib.ggoutlier_check import GgoutlierCheck, \
+    run_checks, _LOG_RE, _wkb_point_xy
+
+
+class _FakeCheck(GgoutlierCheck):
+    """ Sets results without running GGOutlier. Defined at module level so
+    it can be sent to the run_checks worker processes.
+    """
+
+    def run(self, parent_tmp=None):
+        # long enough for checks to still be queued when run_checks is stopped
+        time.sleep(0.2)
+        if self.standard == 'fail':
+            raise ValueError(f"{self.grid_file.name} failed")
+        self.points_total = 100
+        self.points_outside_spec = self.near
+        self.messages.append(self.grid_file.name)
+        self.passed = self.near == 0
+
+
+def _make_check(tmp_path: Path, **kwargs) -> GgoutlierCheck:
+    return GgoutlierCheck(
+        grid_file=tmp_path / 'grid.tif',
+        standard='order1a',
+        near=5,
+        verbose=False,
+        **kwargs
+    )
+
+
+def _process_log(tmp_path: Path, text: bytes) -> GgoutlierCheck:
+    log_file = tmp_path / 'GGOutlier_log.txt'
+    log_file.write_bytes(text)
+    check = _make_check(tmp_path)
+    check._process_ggoutlier_log(log_file)
+    return check
+
+
+def _add_points(check: GgoutlierCheck, count: int) -> int:
+    """ Adds points the same way the shp readers do, returns the number of
+    points added before reading stopped.
+    """
+    for feature_id in range(count):
+        check._add_point_feature(
+            feature_id, 147.0 + feature_id, -42.0, {'depth': -feature_id})
+        if check._check_point_limit(feature_id + 1):
+            return feature_id + 1
+    return count
+
+
+def _read_sequence(data: bytes) -> list[dict]:
+    records = data.split(b'\x1e')
+    # RFC 8142, every record starts with a record separator
+    assert records[0] == b''
+    return [json.loads(r) for r in records[1:]]
+
+
+def test_sequence_file_has_all_points(tmp_path):
+    check = _make_check(tmp_path)
+    check.max_geojson_points = 5
+    check.geojson_sink = io.BytesIO()
+
+    assert _add_points(check, 12) == 12
+
+    data = check.geojson_sink.getvalue()
+    assert data.count(b'\n') == 12
+    features = _read_sequence(data)
+    assert [f['id'] for f in features] == list(range(12))
+    assert features[3] == {
+        "type": "Feature",
+        "id": 3,
+        "geometry": {"type": "Point", "coordinates": [150.0, -42.0]},
+        "properties": {"depth": -3},
+    }
+    # the map only gets up to the limit
+    assert [f['id'] for f in check.geojson_point_features] == list(range(6))
+    assert check.max_geojson_points_exceeded
+    assert len(check.messages) == 1
+
+
+def test_point_limit_without_sink(tmp_path):
+    check = _make_check(tmp_path)
+    check.max_geojson_points = 5
+
+    # reading stops once the limit is exceeded
+    assert _add_points(check, 12) == 6
+    assert len(check.geojson_point_features) == 6
+    assert check.max_geojson_points_exceeded
+    assert len(check.messages) == 1
+
+
+def test_point_limit_not_exceeded(tmp_path):
+    check = _make_check(tmp_path)
+    check.max_geojson_points = 5
+    check.geojson_sink = io.BytesIO()
+
+    _add_points(check, 5)
+    assert len(check.geojson_point_features) == 5
+    assert not check.max_geojson_points_exceeded
+    assert check.messages == []
+
+
+@pytest.mark.parametrize('x, y', [
+    (147.123456789, -42.5),
+    (float('inf'), float('inf')),
+    (float('nan'), 1e-9),
+])
+def test_sequence_paths_match(tmp_path, x, y):
+    # features past the limit are formatted directly, rather than from the
+    # dict used for the map features, both must give the same JSON
+    attributes = {'depth': -12.5, 'name': 'a "b"'}
+    sinks = []
+    for max_points in (10, 1):
+        check = _make_check(tmp_path)
+        check.max_geojson_points = max_points
+        check.geojson_sink = io.BytesIO()
+        check._add_point_feature(5, x, y, attributes)
+        sinks.append(check.geojson_sink.getvalue())
+    assert sinks[0] == sinks[1]
+
+
+def _make_tmp_output(tmp_path: Path) -> GgoutlierCheck:
+    check = _make_check(
+        tmp_path,
+        spatial_outputs_export=True,
+        spatial_outputs_export_location=str(tmp_path / 'export')
+    )
+    src = tmp_path / 'src'
+    src.mkdir()
+    (src / 'outliers.shp').write_bytes(b'shp')
+    check._tmp_abs = str(src)
+    return check
+
+
+def test_move_tmp_dir(tmp_path):
+    check = _make_tmp_output(tmp_path)
+    check._move_tmp_dir()
+
+    dst = Path(check._get_output_file_location())
+    assert (dst / 'outliers.shp').read_bytes() == b'shp'
+    assert not (tmp_path / 'src').exists()
+
+
+def test_move_tmp_dir_cross_device(tmp_path, monkeypatch):
+    def rename(src, dst):
+        raise OSError(errno.EXDEV, 'Invalid cross-device link')
+
+    monkeypatch.setattr(os, 'rename', rename)
+    check = _make_tmp_output(tmp_path)
+    check._move_tmp_dir()
+
+    dst = Path(check._get_output_file_location())
+    assert (dst / 'outliers.shp').read_bytes() == b'shp'
+    assert not (tmp_path / 'src').exists()
+
+
+def test_move_tmp_dir_existing_destination(tmp_path):
+    check = _make_tmp_output(tmp_path)
+    dst = Path(check._get_output_file_location())
+    dst.mkdir(parents=True)
+    (dst / 'previous.txt').write_bytes(b'previous')
+    check._move_tmp_dir()
+
+    # the outputs are copied into the existing destination
+    assert (dst / 'outliers.shp').read_bytes() == b'shp'
+    assert (dst / 'previous.txt').read_bytes() == b'previous'
+    assert not (tmp_path / 'src').exists()
+
+
+def _make_fake_checks(tmp_path: Path, standards: list[str]) -> list[_FakeCheck]:
+    return [
+        _FakeCheck(
+            grid_file=tmp_path / f'grid{i}.tif',
+            standard=standard,
+            near=i,
+            verbose=False
+        )
+        for i, standard in enumerate(standards)
+    ]
+
+
+def test_run_checks(tmp_path):
+    checks = _make_fake_checks(tmp_path, ['order1a', 'fail', 'order1a'])
+    errors = run_checks(checks, max_workers=2)
+
+    assert errors[0] is None
+    assert isinstance(errors[1], ValueError)
+    assert errors[2] is None
+    # results are copied back from the worker processes
+    assert checks[0].passed
+    assert checks[0].messages == ['grid0.tif']
+    assert not checks[2].passed
+    assert checks[2].points_outside_spec == 2
+    assert checks[2].start_time is not None
+    assert checks[2].end_time is not None
+    assert checks[1].start_time is None
+
+
+def test_run_checks_single(tmp_path):
+    checks = _make_fake_checks(tmp_path, ['order1a'])
+    assert run_checks(checks) == [None]
+    assert checks[0].passed
+    assert checks[0].start_time is not None
+
+
+def test_run_checks_stopped(tmp_path):
+    checks = _make_fake_checks(tmp_path, ['order1a'] * 8)
+    errors = run_checks(checks, max_workers=1, is_stopped=lambda: True)
+
+    # only checks that hadn't been started are cancelled
+    cancelled = [isinstance(e, CancelledError) for e in errors]
+    assert any(cancelled)
+    assert not all(cancelled)
+    for check, is_cancelled in zip(checks, cancelled):
+        assert (check.messages == []) == is_cancelled
+
+
+def test_run_checks_single_stopped(tmp_path):
+    checks = _make_fake_checks(tmp_path, ['order1a'])
+    errors = run_checks(checks, is_stopped=lambda: True)
+    assert isinstance(errors[0], CancelledError)
+    assert checks[0].messages == []
+
+
+def test_process_log(tmp_path):
+    check = _process_log(
+        tmp_path,
+        b"INFO:root:Points checked: 28,613,210\n"
+        b"INFO:root:Points outside specification: 1,250\n"
+        b"INFO:root:Percentage outside specification: 0.0043686\n"
+    )
+    assert check.points_total == 28613210
+    assert check.points_outside_spec == 1250
+    assert check.points_outside_spec_percentage == 0.0043686
+
+
+def test_process_log_exponent(tmp_path):
+    check = _process_log(
+        tmp_path,
+        b"INFO:root:Points checked: 28,613,210\r\n"
+        b"INFO:root:Points outside specification: 1\r\n"
+        b"INFO:root:Percentage outside specification: 3.49e-06\r\n"
+    )
+    assert check.points_outside_spec == 1
+    assert check.points_outside_spec_percentage == 3.49e-06
+
+
+def test_process_log_repeated_metrics(tmp_path):
+    check = _process_log(
+        tmp_path,
+        b"INFO:root:Points checked: 10\n"
+        b"INFO:root:Points outside specification: 1\n"
+        b"INFO:root:Percentage outside specification: 10.0\n"
+        b"INFO:root:Points checked: 20\n"
+        b"INFO:root:Points outside specification: 5\n"
+        b"INFO:root:Percentage outside specification: 25.0\n"
+    )
+    assert check.points_total == 20
+    assert check.points_outside_spec == 5
+    assert check.points_outside_spec_percentage == 25.0
+
+
+def test_process_log_missing_value(tmp_path):
+    with pytest.raises(RuntimeError):
+        _process_log(
+            tmp_path,
+            b"INFO:root:Points checked:\n"
+            b"INFO:root:Points outside specification: 1\n"
+        )
+
+
+def test_log_re_value_is_rest_of_line():
+    match = _LOG_RE.search(b"INFO:root:Points checked:\n12\n")
+    assert match['value'] == b''
+
+
+def test_wkb_point_xy_little_endian():
+    wkb = struct.pack('<BIdd', 1, 1, 147.25, -42.5)
+    assert _wkb_point_xy(wkb) == (147.25, -42.5)
+
+
+def test_wkb_point_xy_big_endian():
+    wkb = struct.pack('>BIdd', 0, 1, 147.25, -42.5)
+    assert _wkb_point_xy(wkb) == (147.25, -42.5)
+
+
+def test_wkb_point_xy_iso_point_z():
+    wkb = struct.pack('<BIddd', 1, 1001, 147.25, -42.5, -30.0)
+    assert _wkb_point_xy(wkb) == (147.25, -42.5)
+
+
+def test_wkb_point_xy_extended_point_z():
+    wkb = struct.pack('<BIddd', 1, 0x80000001, 147.25, -42.5, -30.0)
+    assert _wkb_point_xy(wkb) == (147.25, -42.5)
+
+
+def test_wkb_point_xy_not_a_point():
+    # a linestring with two points
+    wkb = struct.pack('<BIIdddd', 1, 2, 2, 0.0, 0.0, 1.0, 1.0)
+    assert _wkb_point_xy(wkb) is None
+
+
+def test_wkb_point_xy_empty():
+    assert _wkb_point_xy(None) is None
+    assert _wkb_point_xy(b'') is None
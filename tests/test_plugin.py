@@ -0,0 +1,65 @@
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from ausseabed.ggoutlier.qax import plugin
+from ausseabed.ggoutlier.qax.plugin import GgoutlierQaxPlugin
+
+
+def _make_check(*filenames: str) -> SimpleNamespace:
+    files = [
+        SimpleNamespace(path=f'/data/{name}', file_type='Survey DTMs')
+        for name in filenames
+    ]
+    # files of other types are never candidates
+    files.append(SimpleNamespace(path='/data/other.gsf', file_type='Raw Files'))
+    return SimpleNamespace(inputs=SimpleNamespace(files=files))
+
+
+@pytest.fixture
+def probed(monkeypatch) -> list[str]:
+    """ Replaces the depth band probe, files named bathy*.tif have a
+    depth band. Returns the names of the files that were probed.
+    """
+    names: list[str] = []
+
+    def is_depth_grid(path: Path) -> bool:
+        names.append(path.name)
+        return path.name.startswith('bathy')
+
+    monkeypatch.setattr(plugin, '_is_depth_grid', is_depth_grid)
+    return names
+
+
+def test_select_name_match_first(probed):
+    check = _make_check('grid_depth.tif', 'bathy.tif')
+    selected = GgoutlierQaxPlugin()._select_grid_file(check)
+    assert selected == Path('/data/grid_depth.tif')
+    assert probed == []
+
+
+def test_select_band_match_before_name_match(probed):
+    check = _make_check('a.tif', 'bathy.tif', 'grid_depth.tif')
+    selected = GgoutlierQaxPlugin()._select_grid_file(check)
+    assert selected == Path('/data/bathy.tif')
+    # files after the name match are never probed
+    assert sorted(probed) == ['a.tif', 'bathy.tif']
+
+
+def test_select_name_match_when_no_band_match(probed):
+    check = _make_check('a.tif', 'b.tif', 'grid_depth.tif', 'c.tif')
+    selected = GgoutlierQaxPlugin()._select_grid_file(check)
+    assert selected == Path('/data/grid_depth.tif')
+    assert sorted(probed) == ['a.tif', 'b.tif']
+
+
+def test_select_no_match(probed):
+    check = _make_check('a.tif', 'b.tif')
+    assert GgoutlierQaxPlugin()._select_grid_file(check) is None
+    assert sorted(probed) == ['a.tif', 'b.tif']
+
+
+def test_select_no_candidates(probed):
+    assert GgoutlierQaxPlugin()._select_grid_file(_make_check()) is None
+    assert probed == []